@@ -1,12 +1,20 @@
 #!/usr/bin/env python3
-from flask import Flask, render_template_string, request, jsonify, send_from_directory
+from flask import Flask, Response, request, session, jsonify
+from flask.json.provider import DefaultJSONProvider
 import os
 import requests
-import json
+from requests.adapters import HTTPAdapter
+import orjson
 from dotenv import load_dotenv
 import threading
+import queue
 import time
 import sys
+import hashlib
+import gzip
+import secrets
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Load environment variables
 load_dotenv()
@@ -19,6 +27,44 @@ if not API_KEY:
 API_URL = "https://api.openai.com/v1/chat/completions"
 AVAILABLE_MODELS = ["gpt-4o", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]
 
+# Upper bound on research prompts sent to the API at the same time
+MAX_PARALLEL_PROMPTS = 8
+# Keep-alive connections held open to the API, enough for a few sessions
+# running their research prompts at once
+HTTP_POOL_SIZE = 20
+
+# Shared HTTP session so every API call reuses pooled keep-alive connections
+# instead of paying a fresh TCP/TLS handshake per request
+http_session = requests.Session()
+http_session.mount("https://", HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+http_session.headers.update({
+    "Content-Type": "application/json",
+    "Authorization": f"Bearer {API_KEY}"
+})
+
+# OpenAI tier-1 request limit; calls only block once this window is used up
+RATE_LIMIT_REQUESTS = 3500
+RATE_LIMIT_PERIOD = 60
+# How many times a request rejected with HTTP 429 is retried
+MAX_RETRIES = 3
+
+# Seconds an idle /events stream waits before re-sending the current progress
+EVENT_KEEPALIVE = 15
+# Sessions untouched for this many seconds are dropped when a new one starts
+SESSION_TTL = 60 * 60
+
+# Completed responses are cached on disk, keyed by a hash of the exact request
+# (model, full message history and prompt), so repeated sessions skip the API
+CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", "response_cache.db")
+
+# Conversations of at least this many turns have their older turns replaced
+# by a single summary before being resent, so each call re-prefills less text
+HISTORY_COMPACT_TURNS = 3
+SUMMARY_MODEL = "gpt-3.5-turbo"
+# The niche and offer turns only need a short acknowledgement, so they use a
+# cheaper model; the selected model is kept for the research itself
+ACKNOWLEDGEMENT_MODEL = "gpt-3.5-turbo"
+
 # Initial prompt
 INITIAL_PROMPT = """You are an expert in writing, copywriting, marketing, market research, offer creation, and behavioral psychology. Your job is to write a compelling document for my desired target audience.
 
@@ -48,7 +94,14 @@ Sounds good?""",
     """Now, some context about my company and my offer to this niche, **{0}**"""
 ]
 
-SCRIPTED_PROMPTS = [
+# The final compilation prompt receives every research answer in one message
+COMPILE_PROMPT_TEMPLATE = """Here are your answers to the research questions:
+
+{0}
+
+{1}"""
+
+SCRIPTED_PROMPTS = (
     """**Market Study: Demographics**
 Please provide general demographics data about my target audience:
 * Gender
@@ -148,9 +201,11 @@ Compile all responses into a comprehensive marketing strategy document with:
 2. Competitive Landscape
 3. Offer Positioning & Strategic Advantage
 Write in clear, plain, powerful language with bullet points where needed."""
-]
+)
 
-PROMPT_NAMES = [
+SUMMARY_PROMPT = """Summarize our conversation so far into a short brief for yourself. Keep every instruction about tone and style, the target niche, my thoughts about that niche, and all details about my company and offer. Leave out greetings and confirmations."""
+
+PROMPT_NAMES = (
     "Collecting Demographic Data",
     "Analyzing Pain Points",
     "Identifying Market Desires",
@@ -162,75 +217,288 @@ PROMPT_NAMES = [
     "Defining Our Appeal",
     "Crafting Unique Selling Proposition",
     "Compiling Final Strategy Document"
-]
+)
+
+N_SCRIPTED = len(SCRIPTED_PROMPTS)
+
+# Prebuilt user messages for the scripted prompts, shared by every request
+# instead of building a new dict per call; never mutate these
+SCRIPTED_PROMPT_MESSAGES = {prompt: {"role": "user", "content": prompt} for prompt in SCRIPTED_PROMPTS}
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serve jsonify() and request.get_json() through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = os.urandom(24)
 
-# Global state
-conversation_state = {
-    'history': [],
-    'step': 0,  # 0=start, 1=niche, 2=offer, 3=processing, 4=complete
-    'model': AVAILABLE_MODELS[0],
-    'final_response': None,
-    'current_prompt': 0,
-    'progress': 0,
-    'status': "Ready to start",
-    'is_processing': False
-}
-
-def get_chatgpt_response(prompt, model, history=None):
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {API_KEY}"
+# The reply to INITIAL_PROMPT only depends on the model, so it is fetched once
+# per model (at temperature 0 to keep it stable) and reused by every session
+INITIAL_RESPONSE_CACHE = {}
+
+# Conversation state per browser session, keyed by the id stored in the
+# signed Flask session cookie
+SESSIONS = {}
+SESSIONS_LOCK = threading.Lock()
+
+def new_conversation_state(model):
+    conversation_state = {
+        'history': [],
+        'step': 0,  # 0=start, 1=niche, 2=offer, 3=processing, 4=complete
+        'model': model,
+        'final_response': None,
+        'current_prompt': 0,
+        'progress': 0,
+        'status': "Starting...",
+        'is_processing': False,
+        'subscribers': set(),  # one event queue per open /events stream
+        'lock': threading.RLock(),  # guards progress updates and subscribers
+        'last_access': time.monotonic(),
+        'done': threading.Event()  # set once the final document is ready
     }
+    # Readers only ever see this snapshot, replaced whole by update_progress()
+    conversation_state['snapshot'] = get_progress_snapshot(conversation_state)
+    return conversation_state
+
+def get_conversation_state():
+    with SESSIONS_LOCK:
+        conversation_state = SESSIONS.get(session.get('sid'))
+        if conversation_state is not None:
+            conversation_state['last_access'] = time.monotonic()
+        return conversation_state
+
+def evict_idle_sessions():
+    # Caller must hold SESSIONS_LOCK
+    cutoff = time.monotonic() - SESSION_TTL
+    idle = [
+        sid for sid, conversation_state in SESSIONS.items()
+        if conversation_state['last_access'] < cutoff and not conversation_state['is_processing']
+    ]
+    for sid in idle:
+        del SESSIONS[sid]
+
+class RateLimiter:
+    """Thread-safe token bucket allowing `rate` requests every `period` seconds."""
+
+    def __init__(self, rate, period):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+
+rate_limiter = RateLimiter(RATE_LIMIT_REQUESTS, RATE_LIMIT_PERIOD)
+
+def get_retry_delay(response, attempt):
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return 2 ** attempt
+
+def post_to_api(payload, stream=False):
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.acquire()
+        response = http_session.post(API_URL, data=orjson.dumps(payload), stream=stream)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            return response
+        # Hand the rejected connection back to the pool before waiting
+        response.close()
+        time.sleep(get_retry_delay(response, attempt))
+
+cache_lock = threading.Lock()
+cache_db = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+cache_db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL)")
+cache_db.commit()
+
+def get_cache_key(payload):
+    canonical = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(canonical).hexdigest()
+
+def get_cached_response(key):
+    with cache_lock:
+        row = cache_db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+def store_cached_response(key, response):
+    with cache_lock:
+        cache_db.execute("INSERT OR REPLACE INTO responses (key, response) VALUES (?, ?)", (key, response))
+        cache_db.commit()
+
+def read_streamed_content(response, on_delta):
+    """Collect a streamed reply, raising if the stream reports an error or ends early."""
+    parts = []
+    with response:
+        for line in response.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            data = line[len(b"data: "):]
+            if data == b"[DONE]":
+                break
+            chunk = orjson.loads(data)
+            if chunk.get("error"):
+                raise ValueError(f"Stream error: {chunk['error']}")
+            choices = chunk.get("choices")
+            delta = choices[0]["delta"].get("content") if choices else None
+            if delta:
+                parts.append(delta)
+                on_delta(delta)
+        else:
+            raise ValueError("Stream ended before [DONE]")
+    if not parts:
+        raise ValueError("Stream returned no content")
+    return "".join(parts)
+
+def get_chatgpt_response(prompt, model, history=None, temperature=0.7, on_delta=None):
+    """Return the model's reply, passing it to on_delta piece by piece as it streams in."""
+    message = SCRIPTED_PROMPT_MESSAGES.get(prompt) or {"role": "user", "content": prompt}
+    messages = history + [message] if history else [message]
     
-    messages = history + [{"role": "user", "content": prompt}] if history else [{"role": "user", "content": prompt}]
+    payload = {
+        "model": model,
+        "messages": messages,
+        "temperature": temperature
+    }
+    key = get_cache_key(payload)
     
     try:
-        response = requests.post(API_URL, headers=headers, json={
-            "model": model,
-            "messages": messages,
-            "temperature": 0.7
-        })
-        response.raise_for_status()
-        return response.json()["choices"][0]["message"]["content"]
+        cached = get_cached_response(key)
+        if cached is not None:
+            if on_delta:
+                on_delta(cached)
+            return cached
+        
+        if on_delta:
+            response = post_to_api({**payload, "stream": True}, stream=True)
+            response.raise_for_status()
+            content = read_streamed_content(response, on_delta)
+        else:
+            response = post_to_api(payload)
+            response.raise_for_status()
+            content = orjson.loads(response.content)["choices"][0]["message"]["content"]
+        if not isinstance(content, str) or not content:
+            raise ValueError("API returned no content")
+        store_cached_response(key, content)
     except Exception as e:
         print(f"API Error: {str(e)}")
         return f"Error: {str(e)}"
-
-def process_all_scripted_prompts():
-    conversation_state['is_processing'] = True
-    conversation_state['step'] = 3
-    conversation_state['progress'] = 0
     
-    for i, prompt in enumerate(SCRIPTED_PROMPTS):
-        conversation_state['current_prompt'] = i
-        conversation_state['status'] = PROMPT_NAMES[i]
-        conversation_state['progress'] = int((i / len(SCRIPTED_PROMPTS))) * 100
-        
-        response = get_chatgpt_response(prompt, conversation_state['model'], conversation_state['history'])
-        
-        conversation_state['history'].extend([
-            {"role": "user", "content": prompt},
-            {"role": "assistant", "content": response}
-        ])
-        
-        time.sleep(1)  # Rate limiting
+    return content
+
+def compact_history(history):
+    """Summarize all but the latest turn once the history is long enough."""
+    if len(history) < HISTORY_COMPACT_TURNS * 2:
+        return history
     
-    # Final compilation
-    conversation_state['status'] = "Finalizing document"
-    final_response = get_chatgpt_response(
-        "Compile all previous responses into a comprehensive marketing strategy document with clear sections.",
-        conversation_state['model'],
-        conversation_state['history']
-    )
+    older, latest = history[:-2], history[-2:]
+    summary = get_chatgpt_response(SUMMARY_PROMPT, SUMMARY_MODEL, older)
+    if summary.startswith("Error:"):
+        return history
     
-    conversation_state['final_response'] = final_response
-    conversation_state['step'] = 4
-    conversation_state['progress'] = 100
-    conversation_state['status'] = "Complete"
-    conversation_state['is_processing'] = False
+    return [{"role": "system", "content": summary}] + latest
+
+def get_progress_snapshot(conversation_state):
+    return {
+        'step': conversation_state['step'],
+        'progress': conversation_state['progress'],
+        'status': conversation_state['status'],
+        'current_prompt': conversation_state['current_prompt'],
+        'total_prompts': N_SCRIPTED,
+        'complete': conversation_state['done'].is_set(),
+        'is_processing': conversation_state['is_processing']
+    }
+
+def update_progress(conversation_state, **fields):
+    """Apply progress fields together and publish them as one consistent snapshot."""
+    with conversation_state['lock']:
+        conversation_state.update(fields)
+        snapshot = get_progress_snapshot(conversation_state)
+        conversation_state['snapshot'] = snapshot
+        publish_event(conversation_state, None, snapshot)
+
+def publish_chunk(conversation_state, delta):
+    with conversation_state['lock']:
+        publish_event(conversation_state, 'chunk', delta)
+
+def publish_event(conversation_state, event, data):
+    for events in conversation_state['subscribers']:
+        events.put((event, data))
+
+def subscribe(conversation_state):
+    """Register a new event queue and return it with the snapshot it starts from."""
+    events = queue.Queue()
+    with conversation_state['lock']:
+        conversation_state['subscribers'].add(events)
+        return events, conversation_state['snapshot']
+
+def unsubscribe(conversation_state, events):
+    with conversation_state['lock']:
+        conversation_state['subscribers'].discard(events)
+
+def format_event(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {orjson.dumps(data).decode('utf-8')}\n\n"
+
+def process_all_scripted_prompts(conversation_state):
+    final_response, status = None, "Complete"
+    try:
+        update_progress(conversation_state, is_processing=True, step=3, progress=0)
+
+        model = conversation_state['model']
+        # The research prompts are independent of each other, so they are all
+        # asked concurrently against the same base context; only the final
+        # compilation prompt needs their answers
+        base_history = compact_history(list(conversation_state['history']))
+        research_prompts = SCRIPTED_PROMPTS[:-1]
+        scripted_responses = [None] * len(research_prompts)
+
+        with ThreadPoolExecutor(max_workers=MAX_PARALLEL_PROMPTS) as executor:
+            futures = {
+                executor.submit(get_chatgpt_response, prompt, model, base_history): (i, name)
+                for i, (prompt, name) in enumerate(zip(research_prompts, PROMPT_NAMES))
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i, name = futures[future]
+                scripted_responses[i] = future.result()
+                update_progress(conversation_state, current_prompt=i, status=name, progress=(done * 100) // N_SCRIPTED)
+
+        research = "\n\n".join(
+            f"**{name}**\n{response}" for name, response in zip(PROMPT_NAMES, scripted_responses)
+        )
+
+        # Final compilation
+        update_progress(conversation_state, current_prompt=N_SCRIPTED - 1, status=PROMPT_NAMES[-1])
+        final_response = get_chatgpt_response(
+            COMPILE_PROMPT_TEMPLATE.format(research, SCRIPTED_PROMPTS[-1]),
+            model,
+            base_history,
+            on_delta=lambda delta: publish_chunk(conversation_state, delta)
+        )
+    except Exception as e:
+        print(f"Processing Error: {str(e)}")
+        final_response, status = f"Error: {str(e)}", "Failed"
+    finally:
+        # Always publish a terminal snapshot so /events streams end
+        conversation_state['final_response'] = final_response
+        conversation_state['done'].set()
+        update_progress(conversation_state, step=4, progress=100, status=status, is_processing=False)
 
 # HTML Template with embedded JavaScript
 HTML_TEMPLATE = """
@@ -302,6 +570,8 @@ HTML_TEMPLATE = """
             const currentStep = document.getElementById('current-step');
             const startBtn = document.getElementById('start-btn');
             const modelSelect = document.getElementById('model');
+            const finalResponse = document.getElementById('final-response');
+            let progressSource = null;  // EventSource of the session being watched
             
             // Start new session
             startBtn.addEventListener('click', function() {
@@ -320,7 +590,10 @@ HTML_TEMPLATE = """
             
             // Start conversation
             function startConversation(model) {
+                stopWatchingProgress();
                 chatHistory.innerHTML = '';
+                finalResponse.textContent = '';
+                document.getElementById('progress-bar-fill').style.width = '0%';
                 document.getElementById('progress-container').style.display = 'none';
                 document.getElementById('results-container').style.display = 'none';
                 
@@ -362,7 +635,7 @@ HTML_TEMPLATE = """
                     if (data.auto_proceed || data.step === 3) {
                         // Show progress and start checking
                         document.getElementById('progress-container').style.display = 'block';
-                        checkProgress();
+                        watchProgress();
                     }
                     
                     if (data.complete) {
@@ -371,16 +644,35 @@ HTML_TEMPLATE = """
                 });
             }
             
-            // Check progress periodically
-            function checkProgress() {
-                fetch('/progress')
-                .then(response => response.json())
-                .then(data => {
+            // Follow progress pushed by the server
+            function stopWatchingProgress() {
+                if (progressSource) {
+                    progressSource.close();
+                    progressSource = null;
+                }
+            }
+            
+            function watchProgress() {
+                stopWatchingProgress();
+                const source = new EventSource('/events');
+                progressSource = source;
+                
+                // Show the final document as it is being written
+                source.addEventListener('chunk', function(event) {
+                    document.getElementById('results-container').style.display = 'block';
+                    finalResponse.textContent += JSON.parse(event.data);
+                });
+                
+                source.onmessage = function(event) {
+                    const data = JSON.parse(event.data);
+                    
                     // Update progress UI
                     document.getElementById('progress-bar-fill').style.width = data.progress + '%';
                     document.getElementById('status-text').innerText = data.status;
                     
                     if (data.complete) {
+                        source.close();
+                        
                         // Show results
                         document.getElementById('progress-container').style.display = 'none';
                         document.getElementById('results-container').style.display = 'block';
@@ -389,13 +681,13 @@ HTML_TEMPLATE = """
                         fetch('/get_final_response')
                         .then(response => response.json())
                         .then(data => {
-                            document.getElementById('final-response').textContent = data.response;
+                            // Ignore replies that arrive after a new session started
+                            if (source === progressSource && !data.error) {
+                                finalResponse.textContent = data.response;
+                            }
                         });
-                    } else {
-                        // Continue checking
-                        setTimeout(checkProgress, 2500);
                     }
-                });
+                };
             }
             
             // Download button handler
@@ -407,7 +699,10 @@ HTML_TEMPLATE = """
             function addMessage(role, content) {
                 const messageDiv = document.createElement('div');
                 messageDiv.className = `message ${role}`;
-                messageDiv.innerHTML = `<strong>${role === 'user' ? 'You' : 'Assistant'}:</strong> ${content}`;
+                const label = document.createElement('strong');
+                label.textContent = `${role === 'user' ? 'You' : 'Assistant'}:`;
+                messageDiv.appendChild(label);
+                messageDiv.appendChild(document.createTextNode(` ${content}`));
                 chatHistory.appendChild(messageDiv);
                 chatHistory.scrollTop = chatHistory.scrollHeight;
             }
@@ -417,29 +712,38 @@ HTML_TEMPLATE = """
 </html>
 """
 
+# The page has no template variables, so it is encoded and compressed once
+INDEX_HTML = HTML_TEMPLATE.encode("utf-8")
+INDEX_HTML_GZIP = gzip.compress(INDEX_HTML, 9)
+
 @app.route('/')
 def index():
-    return render_template_string(HTML_TEMPLATE)
+    headers = {'Cache-Control': 'public, max-age=3600', 'Vary': 'Accept-Encoding'}
+    if request.accept_encodings['gzip'] > 0:
+        headers['Content-Encoding'] = 'gzip'
+        return Response(INDEX_HTML_GZIP, mimetype='text/html', headers=headers)
+    return Response(INDEX_HTML, mimetype='text/html', headers=headers)
 
 @app.route('/start', methods=['POST'])
 def start_conversation():
-    conversation_state.update({
-        'history': [],
-        'step': 0,
-        'model': request.form.get('model', AVAILABLE_MODELS[0]),
-        'final_response': None,
-        'current_prompt': 0,
-        'progress': 0,
-        'status': "Starting...",
-        'is_processing': False
-    })
+    conversation_state = new_conversation_state(request.form.get('model', AVAILABLE_MODELS[0]))
+    sid = secrets.token_urlsafe(16)
+    with SESSIONS_LOCK:
+        evict_idle_sessions()
+        SESSIONS.pop(session.get('sid'), None)
+        SESSIONS[sid] = conversation_state
+    session['sid'] = sid
     
-    response = get_chatgpt_response(INITIAL_PROMPT, conversation_state['model'])
+    response = INITIAL_RESPONSE_CACHE.get(conversation_state['model'])
+    if response is None:
+        response = get_chatgpt_response(INITIAL_PROMPT, conversation_state['model'], temperature=0)
+        if not response.startswith("Error:"):
+            INITIAL_RESPONSE_CACHE[conversation_state['model']] = response
     conversation_state['history'].extend([
         {"role": "user", "content": INITIAL_PROMPT},
         {"role": "assistant", "content": response}
     ])
-    conversation_state['step'] = 1
+    update_progress(conversation_state, step=1)
     
     return jsonify({
         'response': response,
@@ -450,17 +754,21 @@ def start_conversation():
 
 @app.route('/next', methods=['POST'])
 def next_step():
+    conversation_state = get_conversation_state()
+    if conversation_state is None:
+        return jsonify({'error': 'No active session'}), 404
+    
     user_input = request.form.get('input', '').strip()
     
     if conversation_state['step'] == 1:  # Niche info
         prompt = INTERACTIVE_PROMPT_TEMPLATES[0].format(user_input)
-        response = get_chatgpt_response(prompt, conversation_state['model'], conversation_state['history'])
+        response = get_chatgpt_response(prompt, ACKNOWLEDGEMENT_MODEL, conversation_state['history'])
         
         conversation_state['history'].extend([
             {"role": "user", "content": prompt},
             {"role": "assistant", "content": response}
         ])
-        conversation_state['step'] = 2
+        update_progress(conversation_state, step=2)
         
         return jsonify({
             'response': response,
@@ -470,8 +778,15 @@ def next_step():
         })
     
     elif conversation_state['step'] == 2:  # Company info
+        # Claim the research run under the lock so a double-submitted offer
+        # cannot start two pipelines on the same state
+        with conversation_state['lock']:
+            if conversation_state['step'] != 2 or conversation_state['is_processing']:
+                return jsonify({'error': 'Research is already running'})
+            update_progress(conversation_state, step=3, progress=0, is_processing=True)
+        
         prompt = INTERACTIVE_PROMPT_TEMPLATES[1].format(user_input)
-        response = get_chatgpt_response(prompt, conversation_state['model'], conversation_state['history'])
+        response = get_chatgpt_response(prompt, ACKNOWLEDGEMENT_MODEL, conversation_state['history'])
         
         conversation_state['history'].extend([
             {"role": "user", "content": prompt},
@@ -479,8 +794,7 @@ def next_step():
         ])
         
         # Start processing all scripted prompts in background
-        if not conversation_state['is_processing']:
-            threading.Thread(target=process_all_scripted_prompts).start()
+        threading.Thread(target=process_all_scripted_prompts, args=(conversation_state,)).start()
         
         return jsonify({
             'response': "Great! I'm now processing all the marketing research questions. This may take a few minutes...",
@@ -494,33 +808,64 @@ def next_step():
 
 @app.route('/progress')
 def get_progress():
-    return jsonify({
-        'step': conversation_state['step'],
-        'progress': conversation_state['progress'],
-        'status': conversation_state['status'],
-        'current_prompt': conversation_state['current_prompt'],
-        'total_prompts': len(SCRIPTED_PROMPTS),
-        'complete': conversation_state['step'] == 4,
-        'is_processing': conversation_state['is_processing']
-    })
+    conversation_state = get_conversation_state()
+    if conversation_state is None:
+        return jsonify({'error': 'No active session'}), 404
+    
+    return jsonify(conversation_state['snapshot'])
+
+@app.route('/events')
+def progress_events():
+    conversation_state = get_conversation_state()
+    if conversation_state is None:
+        return jsonify({'error': 'No active session'}), 404
+    
+    def generate():
+        # Progress snapshots go out as plain messages, streamed pieces of the
+        # final document as 'chunk' events. Every stream gets its own queue,
+        # filled only with events published after it subscribed.
+        events, snapshot = subscribe(conversation_state)
+        event, data = None, snapshot
+        try:
+            while True:
+                yield format_event(data, event)
+                if event is None and data['complete']:
+                    return
+                try:
+                    event, data = events.get(timeout=EVENT_KEEPALIVE)
+                except queue.Empty:
+                    event, data = None, conversation_state['snapshot']
+        finally:
+            unsubscribe(conversation_state, events)
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 @app.route('/download')
 def download():
+    conversation_state = get_conversation_state()
+    if conversation_state is None:
+        return jsonify({'error': 'No active session'}), 404
+    
     if not conversation_state['final_response']:
         return jsonify({'error': 'Document not ready yet'}), 404
     
-    filename = "marketing_strategy.txt"
-    with open(filename, 'w') as f:
-        f.write(conversation_state['final_response'])
-    
-    return send_from_directory('.', filename, as_attachment=True)
+    return Response(
+        conversation_state['final_response'],
+        mimetype='text/plain',
+        headers={'Content-Disposition': 'attachment; filename="marketing_strategy.txt"'}
+    )
 
 @app.route('/get_final_response')
 def get_final_response():
-    if conversation_state['step'] != 4:
+    conversation_state = get_conversation_state()
+    if conversation_state is None:
+        return jsonify({'error': 'No active session'}), 404
+    
+    if not conversation_state['done'].is_set():
         return jsonify({'error': 'Document not ready yet'}), 404
     return jsonify({'response': conversation_state['final_response']})
 
 if __name__ == '__main__':
+    # Development server only; run `gunicorn bbot:app` in production
     print("Starting Marketing Research Assistant...")
-    app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
\ No newline at end of file
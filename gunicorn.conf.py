@@ -0,0 +1,9 @@
+# Production server settings, picked up by `gunicorn bbot:app`.
+#
+# gevent workers make the blocking OpenAI calls and the long-lived /events
+# streams cooperative, so one worker serves many users concurrently.
+# Sessions live in process memory, so keep a single worker process.
+bind = "0.0.0.0:5000"
+worker_class = "gevent"
+workers = 1
+worker_connections = 200